@@ -5,10 +5,15 @@ Authentication bypass for development.
 Replace with actual authentication logic for production.
 """
 
+import logging
+
 import streamlit as st
 
 from utils.logger import logger
 
+# Level is fixed at import, so check it once rather than per call
+_DEBUG = logger.isEnabledFor(logging.DEBUG)
+
 
 def check_authentication() -> bool:
     """
@@ -21,7 +26,8 @@ def check_authentication() -> bool:
         True if authenticated, False otherwise
     """
     # BYPASS: Always return True for development
-    logger.debug("Authentication bypassed (development mode)")
+    if _DEBUG:
+        logger.debug("Authentication bypassed (development mode)")
     return True
 
 
@@ -50,13 +56,15 @@ def logout() -> None:
     """
     if 'authenticated' in st.session_state:
         del st.session_state['authenticated']
+    st.session_state.pop('_auth_ok', None)
     logger.info("User logged out")
 
 
 def require_auth(func):
     """
     Decorator to require authentication for a page.
-    Currently bypassed.
+    Currently bypassed. A successful check is remembered in session
+    state so later reruns skip it until logout.
     
     Usage:
         @require_auth
@@ -64,7 +72,8 @@ def require_auth(func):
             st.write("Protected content")
     """
     def wrapper(*args, **kwargs):
-        if check_authentication():
+        if st.session_state.get('_auth_ok') or check_authentication():
+            st.session_state['_auth_ok'] = True
             return func(*args, **kwargs)
         else:
             login_page()
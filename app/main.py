@@ -4,14 +4,27 @@ Prism - Simple SecOps Dashboard
 SCC Cleaner + Ops Wiki + Webhook Dashboard
 """
 
+import time
+
 import streamlit as st
-import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent))
+# Static sidebar chrome, one markdown element above and below the toggle
+SIDEBAR_HEADER_HTML = "<h1 style='text-align: center;'>🔷 Prism</h1><hr/>"
+SIDEBAR_FOOTER_HTML = "<hr/><p style='font-size: 0.875rem; opacity: 0.6;'>v2.0 · Cloud SecOps</p>"
 
-from utils.db import init_db, get_setting, set_setting
-from utils.logger import logger
+# Ignore theme toggle clicks that land within this window of the last one
+THEME_TOGGLE_DEBOUNCE_S = 0.3
+
+# Home page tool cards
+CARD_TMPL = "### {title}\n{blurb}"
+HOME_CARDS = (
+    {"title": "🔄 SCC Export Cleaner", "blurb": "Clean SCC finding exports",
+     "button": "Open SCC Cleaner", "page": "pages/1_SCC_Cleaner.py"},
+    {"title": "📚 Ops Wiki", "blurb": "Embedded runbooks & SOPs",
+     "button": "Open Ops Wiki", "page": "pages/2_Ops_Wiki.py"},
+    {"title": "📡 Webhook Dashboard", "blurb": "View workflow notifications",
+     "button": "Open Webhooks", "page": "pages/3_Webhook_Dashboard.py"},
+)
 
 st.set_page_config(
     page_title="Prism | SecOps Tools",
@@ -19,34 +32,58 @@ st.set_page_config(
     layout="wide",
 )
 
-# Initialize database
-init_db()
+# Imported after page config so the first paint isn't held up by
+# logger/DB module setup
+from utils.db import init_db
+from utils.logger import logger
+from utils.theme import THEME_CSS, current_theme, set_theme
 
-# Theme toggle in sidebar
-with st.sidebar:
-    st.markdown("<h1 style='text-align: center;'>🔷 Prism</h1>", unsafe_allow_html=True)
-    st.divider()
+
+@st.cache_resource
+def _init_db_once():
+    """Run schema setup once per server process instead of every rerun."""
+    init_db()
+
+
+def _toggle_theme():
+    """Flip the theme before the rerun the button click already triggers."""
+    now = time.monotonic()
+    if now - st.session_state.get('_theme_toggle_ts', 0.0) < THEME_TOGGLE_DEBOUNCE_S:
+        return
+    st.session_state['_theme_toggle_ts'] = now
     
-    current_theme = get_setting('theme', 'light')
-    theme_label = "🌙 Dark Mode" if current_theme == 'light' else "☀️ Light Mode"
+    new_theme = 'dark' if st.session_state['theme'] == 'light' else 'light'
+    st.session_state['theme'] = new_theme
+    set_theme(new_theme)
+
+
+@st.fragment
+def _theme_sidebar():
+    """Sidebar toggle + theme CSS; toggling reruns only this fragment."""
+    st.markdown(SIDEBAR_HEADER_HTML, unsafe_allow_html=True)
+    
+    # Cache the theme per session so reruns don't hit SQLite
+    if 'theme' not in st.session_state:
+        st.session_state['theme'] = current_theme()
+    theme = st.session_state['theme']
+    theme_label = "🌙 Dark Mode" if theme == 'light' else "☀️ Light Mode"
     
-    if st.button(theme_label, use_container_width=True):
-        new_theme = 'dark' if current_theme == 'light' else 'light'
-        set_setting('theme', new_theme)
-        st.rerun()
+    st.button(theme_label, on_click=_toggle_theme, use_container_width=True)
     
-    st.divider()
-    st.caption("v2.0 · Cloud SecOps")
-
-# Apply theme
-theme = get_setting('theme', 'light')
-if theme == 'dark':
-    st.markdown("""<style>
-        :root { --bg: #1E1E1E; --text: #E0E0E0; --card-bg: #2D2D2D; }
-        html, body, [class*="css"], p, span, div, label, h1, h2, h3 { color: var(--text) !important; }
-        .stApp { background-color: var(--bg) !important; }
-        [data-testid="stSidebar"] { background-color: var(--card-bg) !important; }
-    </style>""", unsafe_allow_html=True)
+    st.markdown(SIDEBAR_FOOTER_HTML, unsafe_allow_html=True)
+    
+    # Apply theme (the style block is global even though it lives in the sidebar)
+    theme_css = THEME_CSS.get(theme, THEME_CSS['light'])
+    if theme_css:
+        st.markdown(theme_css, unsafe_allow_html=True)
+
+
+# Initialize database
+_init_db_once()
+
+# Theme toggle in sidebar
+with st.sidebar:
+    _theme_sidebar()
 
 # Main page
 st.title("Prism")
@@ -54,24 +91,10 @@ st.markdown("SecOps tools for Cloud Security Engineers")
 
 st.divider()
 
-col1, col2, col3 = st.columns(3)
-
-with col1:
-    st.markdown("### 🔄 SCC Export Cleaner")
-    st.markdown("Clean SCC finding exports")
-    if st.button("Open SCC Cleaner", use_container_width=True, type="primary"):
-        st.switch_page("pages/1_SCC_Cleaner.py")
-
-with col2:
-    st.markdown("### 📚 Ops Wiki")
-    st.markdown("Embedded runbooks & SOPs")
-    if st.button("Open Ops Wiki", use_container_width=True, type="primary"):
-        st.switch_page("pages/2_Ops_Wiki.py")
-
-with col3:
-    st.markdown("### 📡 Webhook Dashboard")
-    st.markdown("View workflow notifications")
-    if st.button("Open Webhooks", use_container_width=True, type="primary"):
-        st.switch_page("pages/3_Webhook_Dashboard.py")
+for col, card in zip(st.columns(3), HOME_CARDS):
+    with col:
+        st.markdown(CARD_TMPL.format(**card))
+        if st.button(card['button'], use_container_width=True, type="primary"):
+            st.switch_page(card['page'])
 
 logger.info("Prism loaded")
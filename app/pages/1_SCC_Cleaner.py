@@ -6,26 +6,42 @@ Upload raw SCC CSV export → get cleaned Excel with only relevant columns.
 
 import streamlit as st
 import pandas as pd
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import hashlib
 
 from utils.data_processor import validate_file, process_scc_export, get_project_summary
 from utils.logger import logger
-from utils.db import get_setting
+from utils.theme import apply_theme
 
 st.set_page_config(page_title="SCC Cleaner | Prism", page_icon="🔷", layout="wide")
 
 # Apply theme
-theme = get_setting('theme', 'light')
-if theme == 'dark':
-    st.markdown("""<style>
-        :root { --bg: #1E1E1E; --text: #E0E0E0; --card-bg: #2D2D2D; }
-        html, body, [class*="css"], p, span, div, label, h1, h2, h3, th, td { color: var(--text) !important; }
-        .stApp { background-color: var(--bg) !important; }
-        [data-testid="stSidebar"] { background-color: var(--card-bg) !important; }
-    </style>""", unsafe_allow_html=True)
+apply_theme()
+
+
+def _upload_key(file_bytes: bytes) -> str:
+    """Content digest of an upload, used as the cache key for the parsers below."""
+    return hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+
+
+# The raw bytes are passed as underscore args so Streamlit doesn't re-hash
+# the whole file for each cached call; file_key already identifies it
+@st.cache_data(show_spinner=False, max_entries=4)
+def _validate_upload(file_key: str, _file_bytes: bytes):
+    """Validate an upload once per file instead of on every rerun."""
+    return validate_file(_file_bytes)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _summarize_upload(file_key: str, _file_bytes: bytes) -> pd.DataFrame:
+    """Project-column parse for the summary, cached per file."""
+    return get_project_summary(_file_bytes)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _export_upload(file_key: str, _file_bytes: bytes):
+    """Cleaned Excel and stats for an upload, so pressing the button again doesn't reparse."""
+    return process_scc_export(_file_bytes)
+
 
 st.title("🔄 SCC Export Cleaner")
 st.markdown("Upload a raw SCC finding export (CSV) → Get a clean Excel with only relevant columns.")
@@ -35,13 +51,15 @@ st.divider()
 # File Upload
 uploaded_file = st.file_uploader(
     "Drop your SCC CSV export here",
-    type=['csv'],
-    help="Export findings from Security Command Center as CSV"
+    type=['csv', 'parquet'],
+    help="Export findings from Security Command Center as CSV (Parquet also works)"
 )
 
 if uploaded_file:
     # Validate
-    is_valid, message = validate_file(uploaded_file)
+    file_bytes = uploaded_file.getvalue()
+    file_key = _upload_key(file_bytes)
+    is_valid, message = _validate_upload(file_key, file_bytes)
     
     if not is_valid:
         st.error(f"❌ {message}")
@@ -51,7 +69,7 @@ if uploaded_file:
         # Show project summary
         st.markdown("##### 📊 Project Summary")
         try:
-            summary_df = get_project_summary(uploaded_file)
+            summary_df = _summarize_upload(file_key, file_bytes)
             if not summary_df.empty:
                 col1, col2 = st.columns([2, 1])
                 with col1:
@@ -68,7 +86,7 @@ if uploaded_file:
         if st.button("🚀 Clean & Generate Excel", type="primary", use_container_width=True):
             with st.spinner("Processing... This may take a moment for large files."):
                 try:
-                    output, stats = process_scc_export(uploaded_file)
+                    output, stats = _export_upload(file_key, file_bytes)
                     
                     st.success("✅ Processing complete!")
                     
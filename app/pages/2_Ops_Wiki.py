@@ -6,36 +6,30 @@ Documents open in new tab.
 """
 
 import streamlit as st
+import pandas as pd
 import re
-from datetime import datetime
-import sys
-from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from utils.db import get_documents, add_document, delete_document, get_setting
+from utils.db import get_documents, add_document, delete_documents
+from utils.theme import apply_theme
 
 st.set_page_config(page_title="Ops Wiki | Prism", page_icon="🔷", layout="wide")
 
-# Apply theme
-theme = get_setting('theme', 'light')
-is_dark = theme == 'dark'
-
-if is_dark:
-    st.markdown("""<style>
-        :root { --bg: #1E1E1E; --text: #E0E0E0; --card-bg: #2D2D2D; --border: #404040; --hover: #383838; }
-        html, body, [class*="css"], p, span, div, label, h1, h2, h3 { color: var(--text) !important; }
-        .stApp { background-color: var(--bg) !important; }
-        [data-testid="stSidebar"] { background-color: var(--card-bg) !important; }
+# Gallery card styling layered over the shared theme
+WIKI_DARK_CSS = """<style>
+        :root { --border: #404040; --hover: #383838; }
         input { background-color: var(--card-bg) !important; color: var(--text) !important; }
         .doc-card { background: var(--card-bg); border: 1px solid var(--border); }
         .doc-card:hover { background: var(--hover); border-color: #4DA6FF; }
-    </style>""", unsafe_allow_html=True)
-else:
-    st.markdown("""<style>
+    </style>"""
+
+WIKI_LIGHT_CSS = """<style>
         .doc-card { background: #FFFFFF; border: 1px solid #E0E0E0; }
         .doc-card:hover { background: #F5F5F5; border-color: #1A73E8; }
-    </style>""", unsafe_allow_html=True)
+    </style>"""
+
+# Apply theme (shared base, plus gallery card styling)
+is_dark = apply_theme()
+st.markdown(WIKI_DARK_CSS if is_dark else WIKI_LIGHT_CSS, unsafe_allow_html=True)
 
 # SVG icons for each file type
 ICONS = {
@@ -46,19 +40,28 @@ ICONS = {
     "other": '''<svg viewBox="0 0 48 48" width="32" height="32"><path fill="#90A4AE" d="M37,45H11c-1.7,0-3-1.3-3-3V6c0-1.7,1.3-3,3-3h19l10,10v29C40,43.7,38.7,45,37,45z"/><path fill="#CFD8DC" d="M40,16H30V6L40,16z"/><path fill="#ECEFF1" d="M30,6v10h10L30,6z"/></svg>'''
 }
 
+# Cards rendered per page of the gallery (a multiple of the 3 grid columns)
+PAGE_SIZE = 24
+
+# Google file ID in /d/<id>/ style URLs
+DOC_ID_RE = re.compile(r'/d/([a-zA-Z0-9_-]+)')
+
+# One scan for the Google host/path that decides the doc type; a Drive link
+# has no path group and maps to google_drive
+DOC_TYPE_RE = re.compile(r'docs\.google\.com/(document|spreadsheets|presentation)|drive\.google\.com')
+DOC_TYPES = {
+    'document': 'google_doc',
+    'spreadsheets': 'google_sheet',
+    'presentation': 'google_slides',
+}
+
 
 def detect_doc_type(url: str) -> str:
     """Auto-detect document type from URL."""
-    url_lower = url.lower()
-    if 'docs.google.com/document' in url_lower:
-        return 'google_doc'
-    elif 'docs.google.com/spreadsheets' in url_lower:
-        return 'google_sheet'
-    elif 'docs.google.com/presentation' in url_lower:
-        return 'google_slides'
-    elif 'drive.google.com' in url_lower:
-        return 'google_drive'
-    return 'other'
+    match = DOC_TYPE_RE.search(url.lower())
+    if not match:
+        return 'other'
+    return DOC_TYPES.get(match.group(1), 'google_drive')
 
 
 def extract_title_from_url(url: str, doc_type: str) -> str:
@@ -72,7 +75,7 @@ def extract_title_from_url(url: str, doc_type: str) -> str:
     }
     
     # Try to extract doc ID
-    match = re.search(r'/d/([a-zA-Z0-9_-]+)', url)
+    match = DOC_ID_RE.search(url)
     if match:
         doc_id = match.group(1)[:10]
         return f"{type_names.get(doc_type, 'Document')} ({doc_id}...)"
@@ -80,6 +83,59 @@ def extract_title_from_url(url: str, doc_type: str) -> str:
     return type_names.get(doc_type, 'Document')
 
 
+# Documents only change through this page, so cache them until an add or
+# delete clears the cache instead of querying SQLite on every rerun
+@st.cache_data(show_spinner=False)
+def load_documents():
+    """Get all documents, cached between mutations."""
+    docs_df = get_documents()
+    # Card dates, parsed in one pass instead of per card
+    docs_df['date_str'] = pd.to_datetime(
+        docs_df['created_at'], utc=True, errors='coerce', format='ISO8601'
+    ).dt.strftime("%b %d").fillna("—")
+    return docs_df
+
+
+def card_template(is_dark: bool) -> str:
+    """Gallery card markup with the theme colors filled in; format with url, icon, title, date."""
+    card_bg = "#2D2D2D" if is_dark else "#FFFFFF"
+    border = "#404040" if is_dark else "#E0E0E0"
+    text_color = "#E0E0E0" if is_dark else "#202124"
+    muted_color = "#9AA0A6" if is_dark else "#5F6368"
+    
+    # No blank lines: the joined cards must stay one HTML block
+    return f'''<a href="{{url}}" target="_blank" style="text-decoration: none;">
+    <div style="
+        background: {card_bg};
+        border: 1px solid {border};
+        border-radius: 8px;
+        padding: 16px;
+        margin-bottom: 12px;
+        display: flex;
+        align-items: center;
+        gap: 12px;
+        transition: all 0.2s ease;
+        cursor: pointer;
+    " onmouseover="this.style.borderColor='#1A73E8'; this.style.boxShadow='0 2px 8px rgba(0,0,0,0.15)';"
+       onmouseout="this.style.borderColor='{border}'; this.style.boxShadow='none';">
+        <div style="flex-shrink: 0;">{{icon}}</div>
+        <div style="flex-grow: 1; min-width: 0;">
+            <div style="color: {text_color}; font-weight: 500; font-size: 14px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">
+                {{title}}
+            </div>
+            <div style="color: {muted_color}; font-size: 12px; margin-top: 2px;">
+                {{date}}
+            </div>
+        </div>
+    </div>
+</a>'''
+
+
+def _change_page(step):
+    """Move the gallery forward or back one page."""
+    st.session_state['wiki_page'] = max(0, st.session_state.get('wiki_page', 0) + step)
+
+
 st.title("📚 Ops Wiki")
 
 # Quick add - just paste the link
@@ -98,6 +154,9 @@ with col2:
             doc_type = detect_doc_type(new_url)
             title = extract_title_from_url(new_url, doc_type)
             if add_document(title, new_url, doc_type):
+                load_documents.clear()
+                # Newest documents come first, so show the page with the new one
+                st.session_state['wiki_page'] = 0
                 st.toast("✅ Document added!")
                 st.rerun()
             else:
@@ -108,70 +167,48 @@ with col2:
 st.divider()
 
 # Document gallery
-docs_df = get_documents()
+docs_df = load_documents()
 
 if docs_df.empty:
     st.info("No documents yet. Paste a link above to add your first document.")
 else:
-    # Gallery grid (3 columns)
-    cols = st.columns(3)
+    # Deletes can empty the last page; step back to the last one with cards
+    last_page = (len(docs_df) - 1) // PAGE_SIZE
+    page = min(st.session_state.get('wiki_page', 0), last_page)
+    st.session_state['wiki_page'] = page
+    
+    # Gallery grid (3 columns), sent as one markdown element instead of one
+    # per card
+    card_html = []
+    card_tmpl = card_template(is_dark)
+    
+    gallery_rows = docs_df[['doc_url', 'title', 'doc_type', 'date_str']].iloc[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+    for doc_url, title, doc_type, date_str in gallery_rows.itertuples(index=False, name=None):
+        icon_svg = ICONS.get(doc_type, ICONS['other'])
+        card_html.append(card_tmpl.format(url=doc_url, icon=icon_svg, title=title, date=date_str))
+
+    st.markdown(
+        '<div style="display: grid; grid-template-columns: repeat(3, minmax(0, 1fr)); column-gap: 16px;">'
+        + "".join(card_html) + '</div>',
+        unsafe_allow_html=True
+    )
+    
+    # Pagination
+    if last_page > 0:
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            st.button("← Previous", on_click=_change_page, args=(-1,), disabled=page == 0, use_container_width=True)
+        with col_page:
+            st.markdown(f"<p style='text-align: center;'>Page {page + 1} of {last_page + 1}</p>", unsafe_allow_html=True)
+        with col_next:
+            st.button("Next →", on_click=_change_page, args=(1,), disabled=page == last_page, use_container_width=True)
     
-    for idx, row in docs_df.iterrows():
-        col = cols[idx % 3]
-        
-        with col:
-            doc_type = row['doc_type']
-            icon_svg = ICONS.get(doc_type, ICONS['other'])
-            
-            # Format date
-            created_at = row['created_at']
-            try:
-                if isinstance(created_at, str):
-                    dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    date_str = dt.strftime("%b %d")
-                else:
-                    date_str = "—"
-            except:
-                date_str = "—"
-            
-            # Card with icon, title, and link
-            card_bg = "#2D2D2D" if is_dark else "#FFFFFF"
-            text_color = "#E0E0E0" if is_dark else "#202124"
-            muted_color = "#9AA0A6" if is_dark else "#5F6368"
-            
-            st.markdown(f'''
-                <a href="{row['doc_url']}" target="_blank" style="text-decoration: none;">
-                    <div style="
-                        background: {card_bg};
-                        border: 1px solid {'#404040' if is_dark else '#E0E0E0'};
-                        border-radius: 8px;
-                        padding: 16px;
-                        margin-bottom: 12px;
-                        display: flex;
-                        align-items: center;
-                        gap: 12px;
-                        transition: all 0.2s ease;
-                        cursor: pointer;
-                    " onmouseover="this.style.borderColor='#1A73E8'; this.style.boxShadow='0 2px 8px rgba(0,0,0,0.15)';" 
-                       onmouseout="this.style.borderColor='{'#404040' if is_dark else '#E0E0E0'}'; this.style.boxShadow='none';">
-                        <div style="flex-shrink: 0;">{icon_svg}</div>
-                        <div style="flex-grow: 1; min-width: 0;">
-                            <div style="color: {text_color}; font-weight: 500; font-size: 14px; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">
-                                {row['title']}
-                            </div>
-                            <div style="color: {muted_color}; font-size: 12px; margin-top: 2px;">
-                                {date_str}
-                            </div>
-                        </div>
-                    </div>
-                </a>
-            ''', unsafe_allow_html=True)
-            
-            # Delete option (small popover)
-            with st.popover("⋯", use_container_width=False):
-                st.caption(f"**{row['title']}**")
-                confirm = st.checkbox("Confirm delete", key=f"conf_{row['id']}")
-                if confirm:
-                    if st.button("🗑️ Delete", key=f"del_{row['id']}"):
-                        delete_document(row['id'])
-                        st.rerun()
+    # Delete option: one picker for the whole gallery rather than a popover per card
+    with st.popover("🗑️ Remove documents"):
+        doc_titles = dict(zip(docs_df['id'], docs_df['title']))
+        doc_ids = st.multiselect("Documents", options=list(doc_titles), format_func=doc_titles.get)
+        confirm = st.checkbox("Confirm delete")
+        if st.button("🗑️ Delete", disabled=not (confirm and doc_ids)):
+            delete_documents(doc_ids)
+            load_documents.clear()
+            st.rerun()
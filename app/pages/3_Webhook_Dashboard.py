@@ -8,215 +8,45 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import json
-import sys
-from pathlib import Path
+import sqlite3
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from utils.db import get_setting, get_connection
+from utils.db import DB_LOCK, get_conn
 from utils.logger import logger
+from utils.theme import apply_theme
+from utils.webhook_schema import WEBHOOK_MESSAGES_TABLE, create_webhook_schema
 
 st.set_page_config(page_title="Webhooks | Prism", page_icon="🔷", layout="wide")
 
 # Apply theme
-theme = get_setting('theme', 'light')
-is_dark = theme == 'dark'
-
-if is_dark:
-    st.markdown("""<style>
-        :root { --bg: #1E1E1E; --text: #E0E0E0; --card-bg: #2D2D2D; }
-        html, body, [class*="css"], p, span, div, label, h1, h2, h3, th, td { color: var(--text) !important; }
-        .stApp { background-color: var(--bg) !important; }
-        [data-testid="stSidebar"] { background-color: var(--card-bg) !important; }
-    </style>""", unsafe_allow_html=True)
+is_dark = apply_theme()
 
+# Severity -> (border colour, icon), shared by the text table and the rich cards
+SEV_STYLE = {
+    'critical': ("#DC2626", "🔴"),
+    'error': ("#EA580C", "🟠"),
+    'warning': ("#F59E0B", "🟡"),
+    'info': ("#1A73E8", "🔵"),
+}
+SEV_ICONS = {severity: icon for severity, (_, icon) in SEV_STYLE.items()}
 
-def migrate_webhook_table():
-    """Migrate old webhook table to new schema."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    
-    # Check if old columns exist
-    cursor.execute("PRAGMA table_info(webhook_messages)")
-    columns = {row[1] for row in cursor.fetchall()}
-    
-    # If old schema, migrate
-    if 'message' in columns and 'content' not in columns:
-        logger.info("Migrating webhook_messages table to new schema...")
-        
-        # Rename old table
-        cursor.execute("ALTER TABLE webhook_messages RENAME TO webhook_messages_old")
-        
-        # Create new table
-        cursor.execute("""
-            CREATE TABLE webhook_messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                source TEXT,
-                severity TEXT,
-                message_type TEXT DEFAULT 'text',
-                title TEXT,
-                content TEXT,
-                payload TEXT,
-                received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Migrate data
-        cursor.execute("""
-            INSERT INTO webhook_messages (id, source, severity, message_type, title, content, payload, received_at)
-            SELECT id, source, severity, 'text', '', message, payload, received_at
-            FROM webhook_messages_old
-        """)
-        
-        # Drop old table
-        cursor.execute("DROP TABLE webhook_messages_old")
-        
-        conn.commit()
-        logger.info("Migration complete!")
-    
-    conn.close()
+# Messages rendered per page of the list
+PAGE_SIZE = 20
 
+# Newest messages cached unfiltered; filter changes are served from these
+RECENT_LIMIT = 500
 
-def get_webhook_messages(limit=100, severity_filter=None, source_filter=None):
-    """Fetch webhook messages from database."""
-    # Ensure schema is up to date
-    migrate_webhook_table()
-    
-    conn = get_connection()
-    
-    query = "SELECT * FROM webhook_messages WHERE 1=1"
-    params = []
-    
-    if severity_filter and severity_filter != "All":
-        query += " AND severity = ?"
-        params.append(severity_filter.lower())
-    
-    if source_filter and source_filter != "All":
-        query += " AND source = ?"
-        params.append(source_filter)
-    
-    query += " ORDER BY received_at DESC LIMIT ?"
-    params.append(limit)
-    
-    try:
-        df = pd.read_sql_query(query, conn, params=params)
-        conn.close()
-        return df
-    except Exception as e:
-        logger.error(f"Error fetching webhook messages: {e}")
-        conn.close()
-        return pd.DataFrame()
-
-
-def get_sources():
-    """Get unique sources."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT DISTINCT source FROM webhook_messages ORDER BY source")
-        sources = [row[0] for row in cursor.fetchall()]
-    except:
-        sources = []
-    conn.close()
-    return sources
-
-
-def delete_message(msg_id):
-    """Delete a webhook message."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM webhook_messages WHERE id = ?", (msg_id,))
-    conn.commit()
-    conn.close()
-
-
-def render_message_content(row, is_dark):
-    """Render message content based on type."""
-    # Handle missing columns gracefully
-    content_type = row.get('message_type', 'text') if 'message_type' in row else 'text'
-    content = row.get('content', '') if 'content' in row else row.get('message', '')
-    title = row.get('title', '') if 'title' in row else ''
-    
-    # Title if present
-    if title:
-        st.markdown(f"**{title}**")
-    
-    # Render based on type
-    if content_type == 'table':
-        try:
-            table_data = json.loads(content) if isinstance(content, str) else content
-            headers = table_data.get('headers', [])
-            rows = table_data.get('rows', [])
-            
-            if headers and rows:
-                df = pd.DataFrame(rows, columns=headers)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-            else:
-                st.text(content)
-        except Exception as e:
-            logger.error(f"Error rendering table: {e}")
-            st.text(content)
-    
-    elif content_type == 'list':
-        try:
-            items = json.loads(content) if isinstance(content, str) else content
-            if isinstance(items, list):
-                for item in items:
-                    st.markdown(f"• {item}")
-            else:
-                st.text(content)
-        except Exception as e:
-            logger.error(f"Error rendering list: {e}")
-            st.text(content)
-    
-    elif content_type == 'code':
-        st.code(content, language='text')
-    
-    elif content_type == 'json':
-        try:
-            json_data = json.loads(content) if isinstance(content, str) else content
-            st.json(json_data)
-        except Exception as e:
-            logger.error(f"Error rendering JSON: {e}")
-            st.code(content, language='json')
-    
-    else:  # text
-        st.markdown(content)
-
-
-st.title("📡 Webhook Dashboard")
-st.markdown("View incoming webhook messages from your automated workflows")
-
-st.divider()
-
-# Webhook URL info
-st.markdown("##### Webhook Endpoint")
-st.info("💡 When hosted on GitHub, use the **Webhook URL** provided in the GitHub Actions logs (ends in `.loca.lt`).")
-
-# Try to get the host from headers if available (Streamlit 1.14+)
-try:
-    from streamlit.web.server.server import Server
-    import streamlit.runtime.scriptrunner as scriptrunner
-    
-    # This is a bit hacky but works for some Streamlit versions to get the current URL
-    ctx = scriptrunner.get_script_run_ctx()
-    if ctx:
-        host = st.context.headers.get("Host", "your-app.loca.lt")
-        webhook_url = f"https://{host.replace('.loca.lt', '-webhook.loca.lt')}/webhook/receive"
-    else:
-        webhook_url = "https://your-webhook-url.loca.lt/webhook/receive"
-except:
-    webhook_url = "https://your-webhook-url.loca.lt/webhook/receive"
-
-col1, col2 = st.columns([3, 1])
-with col1:
-    st.code(webhook_url, language="text")
-with col2:
-    if st.button("📋 Copy", use_container_width=True):
-        st.toast("URL copied!")
+# Header strip above each rich message card
+CARD_TMPL = """
+<div style="border-left: 4px solid {border_color}; padding: 12px; margin-bottom: 12px; background: {card_bg}; border-radius: 4px;">
+    <div style="display: flex; justify-content: space-between; margin-bottom: 8px;">
+        <span>{icon} <strong>{source}</strong> · {severity} · {message_type}</span>
+        <span style="color: #9AA0A6; font-size: 0.9em;">{received_at}</span>
+    </div>
+</div>
+"""
 
-with st.expander("📖 API Documentation"):
-    st.markdown(f"""
+# Endpoint docs, filled in with the detected webhook URL
+API_DOCS_TMPL = """
     ### Endpoint
     ```
     POST {webhook_url}
@@ -296,7 +126,455 @@ with st.expander("📖 API Documentation"):
     - `warning` 🟡 - Warnings
     - `error` 🟠 - Errors
     - `critical` 🔴 - Critical alerts
-    """)
+    """
+
+# Columns the dashboard renders (payload is never shown)
+MESSAGE_COLUMNS = "id, source, severity, message_type, title, content, received_at"
+
+# Shared result for when the table can't be read (e.g. not created yet)
+_EMPTY_DF = pd.DataFrame(columns=[c.strip() for c in MESSAGE_COLUMNS.split(",")] + ['received_str'])
+
+
+def migrate_webhook_table():
+    """Migrate old webhook table to new schema."""
+    conn = get_conn()
+    cursor = conn.cursor()
+    
+    # Check if old columns exist
+    with DB_LOCK:
+        cursor.execute("PRAGMA table_info(webhook_messages)")
+        columns = {row[1] for row in cursor.fetchall()}
+    
+    # Table is created by the webhook API; nothing to do until it exists
+    if not columns:
+        return
+    
+    # If old schema, migrate
+    old_schema = 'message' in columns and 'content' not in columns
+    
+    # The shared connection autocommits, so group the steps explicitly
+    with DB_LOCK:
+        cursor.execute("BEGIN")
+        try:
+            if old_schema:
+                logger.info("Migrating webhook_messages table to new schema...")
+                
+                # Rename old table and create the new one in its place
+                cursor.execute("ALTER TABLE webhook_messages RENAME TO webhook_messages_old")
+                cursor.execute(WEBHOOK_MESSAGES_TABLE)
+                
+                # Migrate data
+                cursor.execute("""
+                    INSERT INTO webhook_messages (id, source, severity, message_type, title, content, payload, received_at)
+                    SELECT id, source, severity, 'text', '', message, payload, received_at
+                    FROM webhook_messages_old
+                """)
+                
+                # Drop old table (and the counter triggers that moved with it)
+                cursor.execute("DROP TABLE webhook_messages_old")
+            
+            # Indexes, sources, counters and triggers, as the webhook API creates them
+            create_webhook_schema(cursor)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+    
+    if old_schema:
+        logger.info("Migration complete!")
+
+
+@st.cache_resource
+def _ensure_migrated():
+    """Run the schema migration once per process rather than on every rerun."""
+    migrate_webhook_table()
+    return True
+
+
+_ensure_migrated()
+
+
+def _log_read_error(e, message):
+    """Log a failed read; a missing table is expected until the API creates it."""
+    if "no such table" in str(e):
+        logger.warning("%s: %s (webhook API hasn't created it yet)", message, e)
+    else:
+        logger.exception(message)
+
+
+# Reads are cached briefly so widget reruns don't re-query SQLite; Refresh
+# and deletes clear them explicitly
+@st.cache_data(ttl="30s", max_entries=50, show_spinner=False)
+def _query_messages(limit=100, severity_filter=None, source_filter=None):
+    """Fetch webhook messages from database."""
+    conn = get_conn()
+    
+    query = f"SELECT {MESSAGE_COLUMNS} FROM webhook_messages WHERE 1=1"
+    params = []
+    
+    if severity_filter and severity_filter != "All":
+        query += " AND severity = ?"
+        params.append(severity_filter.lower())
+    
+    if source_filter and source_filter != "All":
+        query += " AND source = ?"
+        params.append(source_filter)
+    
+    query += " ORDER BY received_at DESC LIMIT ?"
+    params.append(limit)
+    
+    try:
+        # Reads hold DB_LOCK too, so they never run inside another session's
+        # open delete transaction on the shared connection
+        with DB_LOCK:
+            cursor = conn.execute(query, params)
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchall()
+        df = pd.DataFrame.from_records(rows, columns=columns)
+    except sqlite3.OperationalError as e:
+        _log_read_error(e, "Error fetching webhook messages")
+        return _EMPTY_DF
+    
+    # SQLite CURRENT_TIMESTAMP is UTC text; parse once, format once for display
+    df['received_at'] = pd.to_datetime(df['received_at'], utc=True, errors='coerce')
+    df['received_str'] = df['received_at'].dt.strftime('%Y-%m-%d %H:%M:%S')
+    return df
+
+
+def get_webhook_messages(limit=100, severity_filter=None, source_filter=None):
+    """
+    Get the newest messages matching the filters.
+    
+    Filters are applied in memory to the cached newest RECENT_LIMIT rows, so
+    changing them doesn't touch SQLite; only pages the window can't fill fall
+    back to a filtered query.
+    """
+    recent = _query_messages(limit=RECENT_LIMIT)
+    if recent.empty:
+        return recent
+    
+    mask = pd.Series(True, index=recent.index)
+    if severity_filter and severity_filter != "All":
+        mask &= recent['severity'].eq(severity_filter.lower())
+    if source_filter and source_filter != "All":
+        mask &= recent['source'].eq(source_filter)
+    matched = recent[mask]
+    
+    # Exact if the window holds every message, or already has enough matches
+    # (anything outside it is older than everything inside)
+    if len(recent) < RECENT_LIMIT or len(matched) >= limit:
+        return matched.head(limit)
+    return _query_messages(limit=limit, severity_filter=severity_filter, source_filter=source_filter)
+
+
+@st.cache_data(ttl="30s", max_entries=50, show_spinner=False)
+def get_severity_counts(severity_filter=None, source_filter=None):
+    """Count matching messages per severity with one grouped query."""
+    query = "SELECT severity, COUNT(*) FROM webhook_messages WHERE 1=1"
+    params = []
+    
+    if severity_filter and severity_filter != "All":
+        query += " AND severity = ?"
+        params.append(severity_filter.lower())
+    
+    if source_filter and source_filter != "All":
+        query += " AND source = ?"
+        params.append(source_filter)
+    
+    query += " GROUP BY severity"
+    
+    try:
+        with DB_LOCK:
+            return dict(get_conn().execute(query, params).fetchall())
+    except sqlite3.OperationalError as e:
+        _log_read_error(e, "Error counting webhook messages")
+        return {}
+
+
+@st.cache_data(ttl="5m", show_spinner=False)
+def get_sources():
+    """Get unique sources from the webhook_sources side table."""
+    try:
+        with DB_LOCK:
+            rows = get_conn().execute("SELECT source FROM webhook_sources ORDER BY source").fetchall()
+        sources = [row[0] for row in rows]
+    except sqlite3.OperationalError:
+        sources = []
+    return sources
+
+
+def clear_message_cache():
+    """Drop cached webhook reads so the next render sees fresh data."""
+    _query_messages.clear()
+    get_severity_counts.clear()
+    get_sources.clear()
+
+
+def delete_messages(msg_ids):
+    """Delete a batch of webhook messages with one statement."""
+    if not msg_ids:
+        return
+    
+    placeholders = ", ".join("?" * len(msg_ids))
+    with DB_LOCK:
+        conn = get_conn()
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f"DELETE FROM webhook_messages WHERE id IN ({placeholders})", list(msg_ids))
+            # Drop sources with no messages left (index lookup per source)
+            conn.execute("""
+                DELETE FROM webhook_sources
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM webhook_messages m WHERE m.source = webhook_sources.source
+                )
+            """)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    clear_message_cache()
+
+
+def delete_message(msg_id):
+    """Delete a webhook message."""
+    delete_messages([msg_id])
+
+
+def delete_selected(msg_ids):
+    """Delete the picked messages and reset the selection widgets."""
+    delete_messages(msg_ids)
+    # New widget keys drop the now-stale selections
+    st.session_state['wh_table_rev'] = st.session_state.get('wh_table_rev', 0) + 1
+
+
+def _change_page(step):
+    """Move the message list forward or back one page."""
+    st.session_state['wh_page'] = max(0, st.session_state.get('wh_page', 0) + step)
+
+
+@st.cache_data(max_entries=500, show_spinner=False)
+def _parse_json(content):
+    """Parse a stored JSON payload once per unique content string."""
+    return json.loads(content)
+
+
+def render_message_content(content_type, title, content, is_dark):
+    """Render message content based on type."""
+    if content_type not in ('table', 'list', 'code', 'json'):
+        # Title if present
+        if title:
+            st.markdown(f"**{title}**")
+        st.markdown(content)
+        return
+    
+    # Structured payloads stay collapsed until opened
+    with st.expander(title or f"View {content_type}", expanded=False):
+        if content_type == 'table':
+            try:
+                table_data = _parse_json(content) if isinstance(content, str) else content
+                headers = table_data.get('headers', [])
+                rows = table_data.get('rows', [])
+                
+                if headers and rows:
+                    df = pd.DataFrame(rows, columns=headers)
+                    st.dataframe(df, use_container_width=True, hide_index=True)
+                else:
+                    st.text(content)
+            except Exception as e:
+                logger.error(f"Error rendering table: {e}")
+                st.text(content)
+        
+        elif content_type == 'list':
+            try:
+                items = _parse_json(content) if isinstance(content, str) else content
+                if isinstance(items, list):
+                    for item in items:
+                        st.markdown(f"• {item}")
+                else:
+                    st.text(content)
+            except Exception as e:
+                logger.error(f"Error rendering list: {e}")
+                st.text(content)
+        
+        elif content_type == 'code':
+            st.code(content, language='text')
+        
+        else:  # json
+            try:
+                json_data = _parse_json(content) if isinstance(content, str) else content
+                st.json(json_data)
+            except Exception as e:
+                logger.error(f"Error rendering JSON: {e}")
+                st.code(content, language='json')
+
+
+# Only the message list reruns on delete/paging clicks; the header, docs
+# and filters above are left alone
+@st.fragment
+def render_messages(source_filter, severity_filter):
+    """Render stats, the current page of messages and pagination controls."""
+    page = st.session_state.get('wh_page', 0)
+    
+    # Get messages (up to the current page plus one page ahead)
+    messages_df = get_webhook_messages(
+        limit=PAGE_SIZE * (page + 2),
+        severity_filter=severity_filter,
+        source_filter=source_filter if source_filter != "All" else None
+    )
+    
+    if messages_df.empty:
+        st.info("No webhook messages yet. Send a test POST request to get started!")
+    else:
+        # Stats cover every matching message, not just the fetched pages
+        counts = get_severity_counts(severity_filter=severity_filter, source_filter=source_filter)
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Total Messages", sum(counts.values()))
+        with col2:
+            st.metric("Info", counts.get('info', 0))
+        with col3:
+            st.metric("Warnings", counts.get('warning', 0))
+        with col4:
+            error_count = counts.get('error', 0) + counts.get('critical', 0)
+            st.metric("Errors", error_count, delta_color="inverse")
+        
+        st.divider()
+        
+        # Deletes can empty the last page; step back to the last one with rows
+        last_page = (len(messages_df) - 1) // PAGE_SIZE
+        if page > last_page:
+            page = st.session_state['wh_page'] = last_page
+        has_next = len(messages_df) > (page + 1) * PAGE_SIZE
+        messages_df = messages_df.iloc[page * PAGE_SIZE:(page + 1) * PAGE_SIZE]
+        
+        # Selections are positional/per page, so key the pickers on the page
+        # and filters too; otherwise a selection would carry over to other rows
+        selection_key = f"{st.session_state.get('wh_table_rev', 0)}_{page}_{severity_filter}_{source_filter}"
+        
+        # Plain text messages are the bulk of traffic, so render them as one
+        # table instead of a card + button per row
+        is_text = messages_df['message_type'].fillna('text').eq('text')
+        df_text = messages_df[is_text]
+        df_rich = messages_df[~is_text]
+        
+        # The split breaks newest-first order across the two groups; say so
+        if not df_text.empty and not df_rich.empty:
+            st.caption("Text messages are listed in the table and structured messages as cards below; "
+                       "each group is newest first, so compare the Received times across them.")
+        
+        if not df_text.empty:
+            df_text = df_text.assign(icon=df_text['severity'].map(SEV_ICONS).fillna(SEV_ICONS['info']))
+            event = st.dataframe(
+                df_text[['icon', 'source', 'severity', 'received_at', 'title', 'content']],
+                column_config={
+                    'icon': st.column_config.TextColumn("", width="small"),
+                    'source': st.column_config.TextColumn("Source"),
+                    'severity': st.column_config.TextColumn("Severity", width="small"),
+                    'received_at': st.column_config.DatetimeColumn("Received", format="YYYY-MM-DD HH:mm:ss"),
+                    'title': st.column_config.TextColumn("Title"),
+                    'content': st.column_config.TextColumn("Message", width="large"),
+                },
+                hide_index=True,
+                use_container_width=True,
+                on_select="rerun",
+                selection_mode="multi-row",
+                key=f"wh_text_table_{selection_key}",
+            )
+            
+            selected_rows = event.selection.rows
+            if selected_rows:
+                selected_ids = [int(i) for i in df_text['id'].iloc[selected_rows]]
+                st.button(f"🗑️ Delete {len(selected_ids)} selected", key="wh_delete_selected",
+                          on_click=delete_selected, args=(selected_ids,))
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+        
+        # Structured messages (table/list/code/json) keep their own cards
+        card_bg = "#2D2D2D" if is_dark else "#F8F9FA"
+        rich_rows = df_rich[['id', 'source', 'severity', 'message_type', 'title', 'content', 'received_str']]
+        
+        # Pick several cards and clear them in one delete
+        if not rich_rows.empty:
+            card_labels = {
+                msg_id: f"{source} · {severity.upper()} · {message_type.upper()} · {received_at}"
+                for msg_id, source, severity, message_type, received_at in rich_rows[
+                    ['id', 'source', 'severity', 'message_type', 'received_str']
+                ].itertuples(index=False, name=None)
+            }
+            selected_cards = st.multiselect(
+                "Select messages to delete",
+                options=list(card_labels),
+                format_func=card_labels.get,
+                key=f"wh_card_select_{selection_key}",
+            )
+            if selected_cards:
+                st.button(f"🗑️ Delete {len(selected_cards)} selected", key="wh_delete_cards",
+                          on_click=delete_selected, args=(selected_cards,))
+        
+        for msg_id, source, severity, message_type, title, content, received_at in rich_rows.itertuples(index=False, name=None):
+            border_color, icon = SEV_STYLE.get(severity, SEV_STYLE['info'])
+            
+            with st.container():
+                col1, col2 = st.columns([20, 1])
+                
+                with col1:
+                    st.markdown(CARD_TMPL.format(
+                        border_color=border_color, card_bg=card_bg, icon=icon, source=source,
+                        severity=severity.upper(), message_type=message_type.upper(), received_at=received_at,
+                    ), unsafe_allow_html=True)
+                    
+                    # Render content
+                    with st.container():
+                        render_message_content(message_type, title, content, is_dark)
+                    
+                    st.markdown("<br>", unsafe_allow_html=True)
+                
+                with col2:
+                    st.button("🗑️", key=f"del_{msg_id}", on_click=delete_message, args=(msg_id,))
+        
+        # Pagination
+        col1, col2, col3 = st.columns([1, 3, 1])
+        with col1:
+            st.button("← Newer", on_click=_change_page, args=(-1,), disabled=page == 0, use_container_width=True)
+        with col2:
+            st.markdown(f"<p style='text-align: center;'>Page {page + 1}</p>", unsafe_allow_html=True)
+        with col3:
+            st.button("Older →", on_click=_change_page, args=(1,), disabled=not has_next, use_container_width=True)
+
+
+st.title("📡 Webhook Dashboard")
+st.markdown("View incoming webhook messages from your automated workflows")
+
+st.divider()
+
+# Webhook URL info
+st.markdown("##### Webhook Endpoint")
+st.info("💡 When hosted on GitHub, use the **Webhook URL** provided in the GitHub Actions logs (ends in `.loca.lt`).")
+
+# Try to get the host from headers if available (Streamlit 1.14+)
+try:
+    from streamlit.web.server.server import Server
+    import streamlit.runtime.scriptrunner as scriptrunner
+    
+    # This is a bit hacky but works for some Streamlit versions to get the current URL
+    ctx = scriptrunner.get_script_run_ctx()
+    if ctx:
+        host = st.context.headers.get("Host", "your-app.loca.lt")
+        webhook_url = f"https://{host.replace('.loca.lt', '-webhook.loca.lt')}/webhook/receive"
+    else:
+        webhook_url = "https://your-webhook-url.loca.lt/webhook/receive"
+except:
+    webhook_url = "https://your-webhook-url.loca.lt/webhook/receive"
+
+col1, col2 = st.columns([3, 1])
+with col1:
+    st.code(webhook_url, language="text")
+with col2:
+    if st.button("📋 Copy", use_container_width=True):
+        st.toast("URL copied!")
+
+with st.expander("📖 API Documentation"):
+    st.markdown(API_DOCS_TMPL.format(webhook_url=webhook_url))
 
 st.divider()
 
@@ -312,77 +590,16 @@ with col2:
 
 with col3:
     if st.button("🔄 Refresh", use_container_width=True):
+        clear_message_cache()
         st.rerun()
 
-# Get messages
-messages_df = get_webhook_messages(
-    limit=100,
-    severity_filter=severity_filter,
-    source_filter=source_filter if source_filter != "All" else None
-)
-
-if messages_df.empty:
-    st.info("No webhook messages yet. Send a test POST request to get started!")
-else:
-    # Stats
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("Total Messages", len(messages_df))
-    with col2:
-        info_count = len(messages_df[messages_df['severity'] == 'info'])
-        st.metric("Info", info_count)
-    with col3:
-        warning_count = len(messages_df[messages_df['severity'] == 'warning'])
-        st.metric("Warnings", warning_count)
-    with col4:
-        error_count = len(messages_df[messages_df['severity'].isin(['error', 'critical'])])
-        st.metric("Errors", error_count, delta_color="inverse")
-    
-    st.divider()
-    
-    # Message list
-    for idx, row in messages_df.iterrows():
-        severity = row['severity']
-        message_type = row.get('message_type', 'text') if 'message_type' in row else 'text'
-        
-        # Color based on severity
-        if severity == 'critical':
-            border_color = "#DC2626"
-            icon = "🔴"
-        elif severity == 'error':
-            border_color = "#EA580C"
-            icon = "🟠"
-        elif severity == 'warning':
-            border_color = "#F59E0B"
-            icon = "🟡"
-        else:
-            border_color = "#1A73E8"
-            icon = "🔵"
-        
-        with st.container():
-            col1, col2 = st.columns([20, 1])
-            
-            with col1:
-                card_bg = "#2D2D2D" if is_dark else "#F8F9FA"
-                
-                st.markdown(f"""
-                <div style="border-left: 4px solid {border_color}; padding: 12px; margin-bottom: 12px; background: {card_bg}; border-radius: 4px;">
-                    <div style="display: flex; justify-content: space-between; margin-bottom: 8px;">
-                        <span>{icon} <strong>{row['source']}</strong> · {severity.upper()} · {message_type.upper()}</span>
-                        <span style="color: #9AA0A6; font-size: 0.9em;">{row['received_at']}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Render content
-                with st.container():
-                    render_message_content(row, is_dark)
-                
-                st.markdown("<br>", unsafe_allow_html=True)
-            
-            with col2:
-                if st.button("🗑️", key=f"del_{row['id']}"):
-                    delete_message(row['id'])
-                    st.rerun()
+# Start from the first page whenever the filters change
+filters = (source_filter, severity_filter)
+if st.session_state.get('wh_filters') != filters:
+    st.session_state['wh_filters'] = filters
+    st.session_state['wh_page'] = 0
+st.session_state.setdefault('wh_page', 0)
+
+render_messages(source_filter, severity_filter)
 
 logger.info("Webhook dashboard loaded")
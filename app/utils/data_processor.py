@@ -1,17 +1,36 @@
 """
 SCC Data Processor
 ==================
-Processes Security Command Center CSV exports.
+Processes Security Command Center CSV (or Parquet) exports.
 Filters columns based on reference list and outputs clean Excel.
 """
 
+import codecs
+import csv
+import re
 import pandas as pd
+import pyarrow.parquet as pq
 from io import BytesIO
-from typing import Tuple
+from typing import BinaryIO, Tuple, Union
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
 from openpyxl.utils import get_column_letter
 
 from utils.logger import logger
 
+# Header row style for the cleaned sheet
+HEADER_FONT = Font(bold=True)
+
+# Parquet files start (and end) with these bytes
+PARQUET_MAGIC = b'PAR1'
+
+# Header checks, compiled once: any SCC field prefix, and a project column
+# whose name mentions "project" and "display" (and "name") in any order
+SCC_COLUMN_RE = re.compile(r'finding\.|resource\.')
+PROJECT_DISPLAY_RE = re.compile(r'(?=.*project)(?=.*display)', re.IGNORECASE | re.DOTALL)
+PROJECT_DISPLAY_NAME_RE = re.compile(r'(?=.*project)(?=.*display)(?=.*name)', re.IGNORECASE | re.DOTALL)
+
 # Reference columns to keep (from SCC Reference Sheet)
 REFERENCE_COLUMNS = [
     "resource.gcp_metadata.project_display_name",
@@ -76,19 +95,66 @@ REFERENCE_COLUMNS = [
     "finding.cloud_armor.security_policy.name",
 ]
 
+# Reference columns paired with their match keys, normalized once at import
+NORMALIZED_REFERENCE_COLUMNS = [(col, col.strip().lower()) for col in REFERENCE_COLUMNS]
+
+# Text columns with a handful of distinct values repeated on every row; parsed
+# as categoricals so each chunk holds one string per value instead of per cell.
+# Boolean and numeric columns are left out: categories always parse as text.
+LOW_CARDINALITY_COLUMNS = frozenset([
+    "resource.gcp_metadata.project_display_name",
+    "resource.type",
+    "resource.cloud_provider",
+    "resource.service",
+    "resource.location",
+    "finding.state",
+    "finding.category",
+    "finding.severity",
+    "finding.mute",
+    "finding.mute_info.static_mute.state",
+    "finding.finding_class",
+    "finding.attack_exposure.state",
+])
+
+
+def _as_stream(uploaded_file: Union[bytes, BinaryIO]) -> BinaryIO:
+    """Wrap raw upload bytes in a fresh BytesIO; pass file objects through."""
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        return BytesIO(uploaded_file)
+    return uploaded_file
 
-def validate_file(uploaded_file) -> Tuple[bool, str]:
+
+def _is_parquet(stream: BinaryIO) -> bool:
+    """Check for the Parquet magic bytes; leaves the stream at the start."""
+    stream.seek(0)
+    magic = stream.read(4)
+    stream.seek(0)
+    return magic == PARQUET_MAGIC
+
+
+def validate_file(uploaded_file: Union[bytes, BinaryIO]) -> Tuple[bool, str]:
     """
-    Validate the uploaded file is a valid SCC CSV export.
+    Validate the uploaded file is a valid SCC CSV (or Parquet) export.
+    
+    Args:
+        uploaded_file: Upload bytes or a file-like object
     
     Returns:
         Tuple of (is_valid, message)
     """
+    # Raw bytes and Streamlit uploads already know their size; only other
+    # file objects need the seek-to-end
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        size = len(uploaded_file)
+    else:
+        size = getattr(uploaded_file, 'size', None)
+    uploaded_file = _as_stream(uploaded_file)
     try:
         # Check file size (max 50MB)
-        uploaded_file.seek(0, 2)
-        size = uploaded_file.tell()
-        uploaded_file.seek(0)
+        if size is None:
+            uploaded_file.seek(0, 2)
+            size = uploaded_file.tell()
+            uploaded_file.seek(0)
         
         if size > 50 * 1024 * 1024:
             return False, "File too large. Maximum size is 50MB."
@@ -96,19 +162,26 @@ def validate_file(uploaded_file) -> Tuple[bool, str]:
         if size == 0:
             return False, "File is empty."
         
-        # Try to read as CSV
-        df = pd.read_csv(uploaded_file, nrows=5)
+        if _is_parquet(uploaded_file):
+            # Column names and row count come from the footer metadata
+            parquet_file = pq.ParquetFile(uploaded_file)
+            columns = parquet_file.schema_arrow.names
+            has_data = parquet_file.metadata.num_rows > 0
+        else:
+            # Only the header and the presence of one data row matter here, so
+            # read lines directly instead of running the CSV parser (skipping
+            # blank lines, as pandas does)
+            lines = (line for line in iter(uploaded_file.readline, b'') if line.strip())
+            header_line = next(lines, b'')
+            has_data = next(lines, None) is not None
+            columns = next(csv.reader([header_line.decode('utf-8-sig', errors='replace')]), [])
         uploaded_file.seek(0)
         
-        if df.empty:
-            return False, "CSV file has no data."
+        if not has_data:
+            return False, "File has no data."
         
         # Check if it has at least some expected SCC columns
-        scc_indicators = ['finding.', 'resource.']
-        has_scc_columns = any(
-            any(indicator in col for indicator in scc_indicators)
-            for col in df.columns
-        )
+        has_scc_columns = any(SCC_COLUMN_RE.search(col) for col in columns)
         
         if not has_scc_columns:
             return False, "This doesn't look like an SCC export. Expected columns like 'finding.*' or 'resource.*'."
@@ -120,42 +193,104 @@ def validate_file(uploaded_file) -> Tuple[bool, str]:
         return False, f"Could not read file: {str(e)}"
 
 
-def process_scc_export(uploaded_file) -> Tuple[BytesIO, dict]:
+def _detect_encoding(uploaded_file) -> str:
     """
-    Process SCC CSV export and filter to reference columns only.
+    Pick the encoding for an SCC export.
     
-    Args:
-        uploaded_file: Streamlit uploaded file object
+    Decodes the file incrementally so a bad byte anywhere (not just in the
+    header) is caught before parsing starts, since chunked reads can't fall
+    back part-way through.
     
     Returns:
-        Tuple of (Excel file as BytesIO, stats dict)
+        'utf-8-sig' (handles a BOM if present) or 'latin-1'
     """
-    logger.info("Starting SCC export processing")
-    
-    # Read the full CSV with support for common encodings
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    uploaded_file.seek(0)
     try:
-        # Try reading with utf-8-sig to handle BOM if present
-        df = pd.read_csv(uploaded_file, encoding='utf-8-sig')
+        for block in iter(lambda: uploaded_file.read(1024 * 1024), b''):
+            decoder.decode(block)
+        decoder.decode(b'', final=True)
+        return 'utf-8-sig'
     except UnicodeDecodeError:
         # Fallback to latin-1 for tricky headers
+        return 'latin-1'
+    finally:
         uploaded_file.seek(0)
-        df = pd.read_csv(uploaded_file, encoding='latin-1')
+
+
+def _write_header(worksheet, out_columns: list, sample: pd.DataFrame) -> None:
+    """
+    Size the columns and write the bold header row.
+    
+    Write-only sheets need column widths before the first row is appended,
+    so widths come from the first chunk of data.
+    """
+    for idx, col in enumerate(sample.columns):
+        # Calculate column width (missing values are written as blank cells)
+        max_length = max(
+            sample[col].astype(object).fillna('').astype(str).str.len().max() if len(sample) > 0 else 0,
+            len(str(out_columns[idx]))
+        )
+        # Cap at 50 characters width
+        adjusted_width = min(max_length + 2, 50)
         
-    original_rows = len(df)
-    original_cols = len(df.columns)
+        # Use proper Excel column letter conversion (1-based index)
+        col_letter = get_column_letter(idx + 1)
+        worksheet.column_dimensions[col_letter].width = adjusted_width
     
-    logger.info(f"Loaded CSV: {original_rows} rows, {original_cols} columns")
+    header = []
+    for col in out_columns:
+        cell = WriteOnlyCell(worksheet, value=col)
+        cell.font = HEADER_FONT
+        header.append(cell)
+    worksheet.append(header)
+
+
+def _drop_timezones(frame: pd.DataFrame) -> pd.DataFrame:
+    """Convert tz-aware datetime columns to naive UTC, since Excel can't store timezones."""
+    for col in frame.select_dtypes(include=['datetimetz']).columns:
+        frame[col] = frame[col].dt.tz_convert(None)
+    return frame
+
+
+def process_scc_export(uploaded_file: Union[bytes, BinaryIO], chunksize: int = 100_000) -> Tuple[BytesIO, dict]:
+    """
+    Process SCC CSV export and filter to reference columns only.
+    
+    The CSV is streamed in chunks of ``chunksize`` rows into a write-only
+    workbook, so only one chunk of parsed data is held at a time. Parquet
+    exports are detected by their magic bytes and read the same way, in
+    record batches of the matched columns.
+    
+    Args:
+        uploaded_file: Upload bytes or a file-like object
+        chunksize: Rows parsed per chunk
+    
+    Returns:
+        Tuple of (Excel file as BytesIO, stats dict)
+    """
+    logger.info("Starting SCC export processing")
+    uploaded_file = _as_stream(uploaded_file)
+    
+    parquet_file = pq.ParquetFile(uploaded_file) if _is_parquet(uploaded_file) else None
+    if parquet_file is not None:
+        existing_cols_orig = parquet_file.schema_arrow.names
+    else:
+        encoding = _detect_encoding(uploaded_file)
+        
+        # Read only the header first so the full parse can skip unused columns
+        existing_cols_orig = pd.read_csv(uploaded_file, encoding=encoding, nrows=0).columns.tolist()
+        uploaded_file.seek(0)
+    original_cols = len(existing_cols_orig)
     
     # Clean and normalize existing column names
-    existing_cols_orig = df.columns.tolist()
     normalized_to_orig = {col.strip().lower(): col for col in existing_cols_orig}
     
     # Find matching columns from reference list (case-insensitive and trimmed)
     matched_columns = []
     missing_columns = []
     
-    for ref_col in REFERENCE_COLUMNS:
-        normalized_ref = ref_col.strip().lower()
+    for ref_col, normalized_ref in NORMALIZED_REFERENCE_COLUMNS:
         if normalized_ref in normalized_to_orig:
             matched_columns.append(normalized_to_orig[normalized_ref])
         else:
@@ -165,12 +300,9 @@ def process_scc_export(uploaded_file) -> Tuple[BytesIO, dict]:
     
     if not matched_columns:
         # Last resort: try substring matching for core project name column
-        project_name_indicators = ['project', 'display', 'name']
-        found_project_col = None
-        for col in existing_cols_orig:
-            if all(ind in col.lower() for ind in project_name_indicators):
-                found_project_col = col
-                break
+        found_project_col = next(
+            (col for col in existing_cols_orig if PROJECT_DISPLAY_NAME_RE.match(col)), None
+        )
         
         if found_project_col:
             matched_columns.append(found_project_col)
@@ -178,34 +310,55 @@ def process_scc_export(uploaded_file) -> Tuple[BytesIO, dict]:
         else:
             raise ValueError("No matching columns found. Please check if this is a valid SCC export.")
     
-    # Filter to only matched columns
-    df_clean = df[matched_columns].copy()
-    
     # Rename first column to "Project Name" for readability
-    if matched_columns and matched_columns[0] == "resource.gcp_metadata.project_display_name":
-        df_clean = df_clean.rename(columns={"resource.gcp_metadata.project_display_name": "Project Name"})
+    out_columns = list(matched_columns)
+    if out_columns[0] == "resource.gcp_metadata.project_display_name":
+        out_columns[0] = "Project Name"
     
-    # Create Excel output
-    output = BytesIO()
+    # Stream only the matched columns; each chunk is reordered to
+    # reference-list order because usecols keeps file order
+    if parquet_file is not None:
+        reader = (
+            _drop_timezones(batch.to_pandas())
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=matched_columns)
+        )
+    else:
+        reader = pd.read_csv(
+            uploaded_file,
+            encoding=encoding,
+            usecols=matched_columns,
+            dtype={col: 'category' for col in matched_columns if col.strip().lower() in LOW_CARDINALITY_COLUMNS},
+            chunksize=chunksize,
+        )
     
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df_clean.to_excel(writer, sheet_name='Cleaned Findings', index=False)
+    # Create Excel output (write-only mode streams rows instead of keeping
+    # a cell object per value in memory)
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet('Cleaned Findings')
+    original_rows = 0
+    header_written = False
+    
+    for chunk in reader:
+        chunk = chunk[matched_columns]
+        if not header_written:
+            _write_header(worksheet, out_columns, chunk)
+            header_written = True
+        
+        # Blank cells for missing values, as to_excel would write them
+        rows = chunk.astype(object).where(chunk.notna(), None)
+        for row in rows.itertuples(index=False, name=None):
+            worksheet.append(row)
         
-        # Auto-adjust column widths using proper Excel column naming
-        worksheet = writer.sheets['Cleaned Findings']
-        for idx, col in enumerate(df_clean.columns):
-            # Calculate column width
-            max_length = max(
-                df_clean[col].astype(str).map(len).max() if len(df_clean) > 0 else 0,
-                len(str(col))
-            )
-            # Cap at 50 characters width
-            adjusted_width = min(max_length + 2, 50)
-            
-            # Use proper Excel column letter conversion (1-based index)
-            col_letter = get_column_letter(idx + 1)
-            worksheet.column_dimensions[col_letter].width = adjusted_width
+        original_rows += len(chunk)
     
+    if not header_written:
+        # No data rows: still write the header
+        _write_header(worksheet, out_columns, pd.DataFrame(columns=matched_columns))
+    
+    logger.info(f"Loaded CSV: {original_rows} rows, {original_cols} columns")
+    
+    output = BytesIO()
+    workbook.save(output)
     output.seek(0)
     
     # Collect stats
@@ -222,30 +375,47 @@ def process_scc_export(uploaded_file) -> Tuple[BytesIO, dict]:
     return output, stats
 
 
-def get_project_summary(uploaded_file) -> pd.DataFrame:
+def get_project_summary(uploaded_file: Union[bytes, BinaryIO]) -> pd.DataFrame:
     """
     Get a summary of findings by project.
     
+    Args:
+        uploaded_file: Upload bytes or a file-like object
+    
     Returns:
         DataFrame with project name and finding count
     """
-    df = pd.read_csv(uploaded_file)
-    uploaded_file.seek(0)
+    stream = _as_stream(uploaded_file)
+    parquet_file = pq.ParquetFile(stream) if _is_parquet(stream) else None
+    if parquet_file is not None:
+        columns = parquet_file.schema_arrow.names
+    else:
+        columns = pd.read_csv(stream, nrows=0).columns
     
     project_col = "resource.gcp_metadata.project_display_name"
     
-    if project_col not in df.columns:
+    if project_col not in columns:
         # Try alternate column names
-        for col in df.columns:
-            if 'project' in col.lower() and 'display' in col.lower():
-                project_col = col
-                break
+        project_col = next((col for col in columns if PROJECT_DISPLAY_RE.match(col)), project_col)
     
-    if project_col not in df.columns:
+    if project_col not in columns:
         return pd.DataFrame(columns=['Project Name', 'Finding Count'])
     
-    summary = df.groupby(project_col).size().reset_index(name='Finding Count')
-    summary = summary.rename(columns={project_col: 'Project Name'})
-    summary = summary.sort_values('Finding Count', ascending=False)
+    # Parse only the project column, as a categorical: few distinct projects
+    # across many findings, so counting works on integer codes instead of
+    # hashing every string
+    if parquet_file is not None:
+        df = parquet_file.read(columns=[project_col]).to_pandas()
+    else:
+        stream.seek(0)
+        df = pd.read_csv(stream, usecols=[project_col], dtype={project_col: 'category'})
+    
+    # One counting pass that comes back already sorted by count
+    summary = (
+        df[project_col].value_counts()
+        .rename_axis('Project Name')
+        .reset_index(name='Finding Count')
+    )
+    summary['Project Name'] = summary['Project Name'].astype(str)
     
     return summary
@@ -5,22 +5,52 @@ Manages clients, client details, documents, and settings.
 """
 
 import sqlite3
+import threading
 from datetime import datetime
 from typing import Optional
 
 import pandas as pd
+import streamlit as st
 
 from utils.logger import logger
 
 DB_PATH = "/app/data/prism.db"
 
+# Serializes writes on the shared connection across Streamlit sessions
+DB_LOCK = threading.Lock()
+
+# Columns returned by get_clients() / get_documents()
+CLIENT_COLUMNS = ['id', 'client_name', 'gcp_project_id', 'created_at']
+DOCUMENT_COLUMNS = ['id', 'title', 'doc_url', 'doc_type', 'created_at']
+
 
 def get_connection() -> sqlite3.Connection:
+    """Open a standalone connection (schema setup only; everything else uses get_conn)."""
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+@st.cache_resource
+def get_conn() -> sqlite3.Connection:
+    """
+    Get the process-wide shared connection.
+    
+    Opened once and reused across reruns and sessions, in autocommit mode.
+    Don't close it; hold DB_LOCK around every use, reads included, since a
+    read from another session would otherwise run inside a writer's open
+    BEGIN...COMMIT and see (or lose, on ROLLBACK) its uncommitted rows.
+    """
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MB memory-mapped reads
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MB page cache
+    return conn
+
+
 def init_db() -> None:
     """Initialize database with all required tables."""
     logger.info("Initializing database...")
@@ -50,6 +80,21 @@ def init_db() -> None:
         )
     """)
     
+    # One row per (client, field), so save_client_detail's upsert has a
+    # conflict target; keep the newest row of any older duplicates first
+    cursor.execute("""
+        DELETE FROM client_details WHERE id NOT IN (
+            SELECT MAX(id) FROM client_details GROUP BY client_id, field_name
+        )
+    """)
+    cursor.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_client_details_client_field
+        ON client_details(client_id, field_name)
+    """)
+    
+    # get_clients() lists newest first
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_clients_created ON clients(created_at DESC)")
+    
     # Documents for Ops Wiki
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS documents (
@@ -82,164 +127,128 @@ def init_db() -> None:
 # ============ CLIENT FUNCTIONS ============
 
 def add_client(name: str, project_id: str) -> tuple[bool, str]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute(
-            "INSERT INTO clients (client_name, gcp_project_id) VALUES (?, ?)",
-            (name.strip(), project_id.strip())
-        )
-        conn.commit()
+        with DB_LOCK:
+            get_conn().execute(
+                "INSERT INTO clients (client_name, gcp_project_id) VALUES (?, ?)",
+                (name.strip(), project_id.strip())
+            )
         return True, f"Client '{name}' added!"
     except sqlite3.IntegrityError:
         return False, f"Project ID '{project_id}' already exists."
     except Exception as e:
         return False, str(e)
-    finally:
-        conn.close()
 
 
 def get_clients() -> pd.DataFrame:
-    conn = get_connection()
     try:
-        df = pd.read_sql_query(
-            "SELECT id, client_name, gcp_project_id, created_at FROM clients ORDER BY created_at DESC",
-            conn
-        )
-        return df
+        with DB_LOCK:
+            rows = get_conn().execute(
+                f"SELECT {', '.join(CLIENT_COLUMNS)} FROM clients ORDER BY created_at DESC"
+            ).fetchall()
+        return pd.DataFrame.from_records(rows, columns=CLIENT_COLUMNS)
     except:
-        return pd.DataFrame(columns=['id', 'client_name', 'gcp_project_id', 'created_at'])
-    finally:
-        conn.close()
+        return pd.DataFrame(columns=CLIENT_COLUMNS)
 
 
 def get_client_by_id(client_id: int) -> Optional[dict]:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT * FROM clients WHERE id = ?", (client_id,))
-        result = cursor.fetchone()
-        return dict(result) if result else None
-    finally:
-        conn.close()
+    with DB_LOCK:
+        result = get_conn().execute("SELECT * FROM clients WHERE id = ?", (client_id,)).fetchone()
+    return dict(result) if result else None
 
 
 def delete_client(client_id: int) -> bool:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM clients WHERE id = ?", (client_id,))
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
+    with DB_LOCK:
+        cursor = get_conn().execute("DELETE FROM clients WHERE id = ?", (client_id,))
+    return cursor.rowcount > 0
 
 
 # ============ CLIENT DETAILS FUNCTIONS ============
 
 def get_client_details(client_id: int) -> dict:
     """Get all details for a client as a dictionary."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
+    with DB_LOCK:
+        rows = get_conn().execute(
             "SELECT field_name, field_value FROM client_details WHERE client_id = ?",
             (client_id,)
-        )
-        return {row['field_name']: row['field_value'] for row in cursor.fetchall()}
-    finally:
-        conn.close()
+        ).fetchall()
+    return {row['field_name']: row['field_value'] for row in rows}
 
 
 def save_client_detail(client_id: int, field_name: str, field_value: str) -> bool:
     """Save or update a client detail field."""
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            INSERT INTO client_details (client_id, field_name, field_value, updated_at)
-            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            ON CONFLICT(client_id, field_name) DO UPDATE SET
-                field_value = excluded.field_value,
-                updated_at = CURRENT_TIMESTAMP
-        """, (client_id, field_name, field_value))
-        conn.commit()
-        return True
-    except:
-        # If unique constraint doesn't exist, use old method
-        cursor.execute("DELETE FROM client_details WHERE client_id = ? AND field_name = ?", (client_id, field_name))
-        cursor.execute(
-            "INSERT INTO client_details (client_id, field_name, field_value) VALUES (?, ?, ?)",
-            (client_id, field_name, field_value)
-        )
-        conn.commit()
-        return True
-    finally:
-        conn.close()
+    with DB_LOCK:
+        conn = get_conn()
+        try:
+            conn.execute("""
+                INSERT INTO client_details (client_id, field_name, field_value, updated_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(client_id, field_name) DO UPDATE SET
+                    field_value = excluded.field_value,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (client_id, field_name, field_value))
+        except sqlite3.OperationalError:
+            # If unique constraint doesn't exist, use old method
+            conn.execute("DELETE FROM client_details WHERE client_id = ? AND field_name = ?", (client_id, field_name))
+            conn.execute(
+                "INSERT INTO client_details (client_id, field_name, field_value) VALUES (?, ?, ?)",
+                (client_id, field_name, field_value)
+            )
+    return True
 
 
 # ============ DOCUMENT FUNCTIONS ============
 
 def add_document(title: str, url: str, doc_type: str = 'google_doc') -> bool:
-    conn = get_connection()
-    cursor = conn.cursor()
     try:
-        cursor.execute(
-            "INSERT INTO documents (title, doc_url, doc_type) VALUES (?, ?, ?)",
-            (title.strip(), url.strip(), doc_type)
-        )
-        conn.commit()
+        with DB_LOCK:
+            get_conn().execute(
+                "INSERT INTO documents (title, doc_url, doc_type) VALUES (?, ?, ?)",
+                (title.strip(), url.strip(), doc_type)
+            )
         return True
     except:
         return False
-    finally:
-        conn.close()
 
 
 def get_documents() -> pd.DataFrame:
-    conn = get_connection()
     try:
-        return pd.read_sql_query("SELECT * FROM documents ORDER BY created_at DESC", conn)
+        with DB_LOCK:
+            rows = get_conn().execute(
+                f"SELECT {', '.join(DOCUMENT_COLUMNS)} FROM documents ORDER BY created_at DESC"
+            ).fetchall()
+        return pd.DataFrame.from_records(rows, columns=DOCUMENT_COLUMNS)
     except:
-        return pd.DataFrame(columns=['id', 'title', 'doc_url', 'doc_type', 'created_at'])
-    finally:
-        conn.close()
+        return pd.DataFrame(columns=DOCUMENT_COLUMNS)
+
+
+def delete_documents(doc_ids: list[int]) -> int:
+    """Delete several documents in one statement; returns how many were removed."""
+    if not doc_ids:
+        return 0
+    
+    placeholders = ",".join("?" * len(doc_ids))
+    with DB_LOCK:
+        cursor = get_conn().execute(f"DELETE FROM documents WHERE id IN ({placeholders})", list(doc_ids))
+    return cursor.rowcount
 
 
 def delete_document(doc_id: int) -> bool:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
-        conn.commit()
-        return cursor.rowcount > 0
-    finally:
-        conn.close()
+    return delete_documents([doc_id]) > 0
 
 
 # ============ SETTINGS FUNCTIONS ============
 
 def get_setting(key: str, default: str = None) -> str:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
-        result = cursor.fetchone()
-        return result['value'] if result else default
-    finally:
-        conn.close()
+    with DB_LOCK:
+        result = get_conn().execute("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+    return result['value'] if result else default
 
 
 def set_setting(key: str, value: str) -> bool:
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(
+    with DB_LOCK:
+        get_conn().execute(
             "INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
             (key, value)
         )
-        conn.commit()
-        return True
-    finally:
-        conn.close()
+    return True
@@ -5,11 +5,15 @@ Comprehensive logging with DEBUG level for troubleshooting.
 Logs to: /app/logs/prism_debug.log
 """
 
+import atexit
+import copy
 import logging
 import os
+import queue
 import sys
-import traceback
-from logging.handlers import RotatingFileHandler
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 from functools import wraps
 
@@ -18,6 +22,8 @@ LOG_DIR = "/app/logs"
 LOG_FILE = os.path.join(LOG_DIR, "prism_debug.log")
 MAX_BYTES = 10 * 1024 * 1024  # 10MB
 BACKUP_COUNT = 5
+BUFFER_SIZE = 64 * 1024  # bytes buffered before the file sees a write()
+FLUSH_INTERVAL = 0.5  # seconds between background flushes
 
 # Ensure log directory exists
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -29,8 +35,53 @@ logger.setLevel(logging.DEBUG)  # Capture everything
 # Clear existing handlers
 logger.handlers = []
 
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    RotatingFileHandler that buffers writes instead of flushing per record.
+    
+    The buffer is flushed by flush() (see _flush_log_periodically), on
+    rollover and on close. The file size is tracked here because the base
+    class's seek/tell size check would flush the buffer on every record.
+    """
+    
+    def _open(self):
+        stream = open(self.baseFilename, self.mode, buffering=BUFFER_SIZE,
+                      encoding=self.encoding, errors=self.errors)
+        self._bytes = stream.tell()
+        return stream
+    
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+            # maxBytes and tell() count encoded bytes, not characters
+            size = len(msg.encode(self.encoding or 'utf-8', self.errors or 'strict'))
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._bytes + size >= self.maxBytes:
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(msg)
+            self._bytes += size
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler that enqueues records unformatted, for the listener to format."""
+    
+    def prepare(self, record):
+        # The queue never leaves this process, so skip QueueHandler's
+        # format-on-enqueue; a shallow copy keeps the listener's formatting
+        # from racing the console handler on the same record
+        return copy.copy(record)
+
+
 # File handler - captures DEBUG and above
-file_handler = RotatingFileHandler(
+file_handler = BufferedRotatingFileHandler(
     LOG_FILE,
     maxBytes=MAX_BYTES,
     backupCount=BACKUP_COUNT,
@@ -44,7 +95,24 @@ file_format = logging.Formatter(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 file_handler.setFormatter(file_format)
-logger.addHandler(file_handler)
+
+# The file handler runs on a listener thread, so for the file a log call only
+# enqueues the record; formatting, the write and any rotation happen there
+log_queue = queue.SimpleQueue()
+logger.addHandler(DeferredQueueHandler(log_queue))
+listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
+
+
+def _flush_log_periodically():
+    """Push buffered log lines to disk every FLUSH_INTERVAL seconds."""
+    while True:
+        time.sleep(FLUSH_INTERVAL)
+        file_handler.flush()
+
+
+threading.Thread(target=_flush_log_periodically, name="log-flusher", daemon=True).start()
 
 # Console handler - INFO and above only
 console_handler = logging.StreamHandler(sys.stdout)
@@ -62,13 +130,12 @@ def log_exception(e: Exception, context: str = ""):
         e: The exception
         context: Additional context about where/what failed
     """
-    tb = traceback.format_exc()
-    logger.error(f"{'='*60}")
-    logger.error(f"EXCEPTION: {type(e).__name__}: {str(e)}")
+    # One record carrying exc_info; the file handler formats the traceback on
+    # the listener thread, the console handler still formats it on this one
     if context:
-        logger.error(f"CONTEXT: {context}")
-    logger.error(f"TRACEBACK:\n{tb}")
-    logger.error(f"{'='*60}")
+        logger.error("EXCEPTION %s: %s (context=%s)", type(e).__name__, e, context, exc_info=e)
+    else:
+        logger.error("EXCEPTION %s: %s", type(e).__name__, e, exc_info=e)
 
 
 def log_function_call(func):
@@ -76,13 +143,18 @@ def log_function_call(func):
     Decorator to log function entry, exit, and any exceptions.
     Use on functions you want to trace.
     """
+    func_name = func.__name__
+    
     @wraps(func)
     def wrapper(*args, **kwargs):
-        func_name = func.__name__
-        logger.debug(f"→ ENTER: {func_name}(args={args[:2] if args else ''}, kwargs={list(kwargs.keys())})")
+        # Skip building the argument summary when DEBUG is filtered out
+        tracing = logger.isEnabledFor(logging.DEBUG)
+        if tracing:
+            logger.debug("ENTER: %s(args=%s, kwargs=%s)", func_name, args[:2] if args else '', list(kwargs.keys()))
         try:
             result = func(*args, **kwargs)
-            logger.debug(f"← EXIT: {func_name} → success")
+            if tracing:
+                logger.debug("EXIT: %s -> success", func_name)
             return result
         except Exception as e:
             log_exception(e, f"Function: {func_name}")
@@ -92,23 +164,30 @@ def log_function_call(func):
 
 def log_page_load(page_name: str):
     """Log when a page is loaded."""
-    logger.info(f"📄 PAGE LOAD: {page_name}")
+    logger.info("PAGE LOAD: %s", page_name)
 
 
 def log_user_action(action: str, details: str = ""):
     """Log user actions for debugging."""
-    logger.info(f"👤 USER ACTION: {action} | {details}" if details else f"👤 USER ACTION: {action}")
+    if details:
+        logger.info("USR %s | %s", action, details)
+    else:
+        logger.info("USR %s", action)
 
 
 def log_db_operation(operation: str, success: bool, details: str = ""):
     """Log database operations."""
-    status = "✓" if success else "✗"
+    # Short ASCII tags keep log lines single-byte
+    tag = "DB+" if success else "DB-"
     level = logging.DEBUG if success else logging.ERROR
-    logger.log(level, f"🗄️ DB {status}: {operation} | {details}" if details else f"🗄️ DB {status}: {operation}")
+    if details:
+        logger.log(level, "%s %s | %s", tag, operation, details)
+    else:
+        logger.log(level, "%s %s", tag, operation)
 
 
 # Log startup
 logger.info("="*60)
-logger.info(f"PRISM LOGGER INITIALIZED | {datetime.now().isoformat()}")
-logger.info(f"Log file: {LOG_FILE}")
+logger.info("PRISM LOGGER INITIALIZED | %s", datetime.now().isoformat())
+logger.info("Log file: %s", LOG_FILE)
 logger.info("="*60)
@@ -0,0 +1,54 @@
+"""
+Project Prism - Theme Helpers
+=============================
+Shared theme CSS and a cached theme lookup used by every page.
+"""
+
+import streamlit as st
+
+from utils.db import get_setting, set_setting
+
+# Dark-mode overrides shared by all pages (light mode uses Streamlit defaults)
+DARK_CSS = """<style>
+        :root { --bg: #1E1E1E; --text: #E0E0E0; --card-bg: #2D2D2D; }
+        html, body, [class*="css"], p, span, div, label, h1, h2, h3, th, td { color: var(--text) !important; }
+        .stApp { background-color: var(--bg) !important; }
+        [data-testid="stSidebar"] { background-color: var(--card-bg) !important; }
+    </style>"""
+
+THEME_CSS = {
+    'dark': DARK_CSS,
+    'light': "",
+}
+
+
+@st.cache_resource
+def current_theme() -> str:
+    """Get the saved theme, reading SQLite once per process."""
+    return get_setting('theme', 'light')
+
+
+@st.cache_resource
+def current_theme_css() -> str:
+    """Get the <style> block for the saved theme (empty for light)."""
+    return THEME_CSS.get(current_theme(), THEME_CSS['light'])
+
+
+def set_theme(theme: str) -> None:
+    """Save the theme and drop the cached lookups so every page picks it up."""
+    set_setting('theme', theme)
+    current_theme.clear()
+    current_theme_css.clear()
+
+
+def apply_theme() -> bool:
+    """
+    Inject the saved theme's CSS into the page.
+
+    Returns:
+        True if the dark theme is active
+    """
+    css = current_theme_css()
+    if css:
+        st.markdown(css, unsafe_allow_html=True)
+    return current_theme() == 'dark'
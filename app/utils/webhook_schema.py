@@ -0,0 +1,68 @@
+"""
+Webhook Schema
+==============
+Tables, indexes and counter triggers for webhook messages, shared by the
+webhook API (which creates them) and the dashboard (which migrates old
+databases). Kept free of Streamlit/Flask imports so both can use it.
+"""
+
+WEBHOOK_MESSAGES_TABLE = """
+    CREATE TABLE IF NOT EXISTS webhook_messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source TEXT,
+        severity TEXT,
+        message_type TEXT DEFAULT 'text',
+        title TEXT,
+        content TEXT,
+        payload TEXT,
+        received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Indexes for the dashboard's newest-first listing and its filters
+WEBHOOK_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_wh_received ON webhook_messages(received_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_wh_sev_recv ON webhook_messages(severity, received_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_wh_src_recv ON webhook_messages(source, received_at DESC)",
+)
+
+# One row per source so the dashboard filter doesn't scan every message
+WEBHOOK_SOURCES = (
+    """CREATE TABLE IF NOT EXISTS webhook_sources (
+        source TEXT PRIMARY KEY,
+        last_seen TIMESTAMP
+    )""",
+    """INSERT OR IGNORE INTO webhook_sources (source, last_seen)
+    SELECT source, MAX(received_at) FROM webhook_messages
+    WHERE source IS NOT NULL
+    GROUP BY source""",
+    "DELETE FROM webhook_sources WHERE source IS NULL",
+)
+
+# Per-severity message counts kept current by triggers, so stats don't scan
+# the whole table; rebuilt each time in case they drifted
+WEBHOOK_COUNTERS = (
+    """CREATE TABLE IF NOT EXISTS webhook_counters (
+        severity TEXT PRIMARY KEY,
+        count INTEGER NOT NULL DEFAULT 0
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS trg_wh_count_insert AFTER INSERT ON webhook_messages
+    BEGIN
+        INSERT INTO webhook_counters (severity, count) VALUES (NEW.severity, 1)
+        ON CONFLICT(severity) DO UPDATE SET count = count + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_wh_count_delete AFTER DELETE ON webhook_messages
+    BEGIN
+        UPDATE webhook_counters SET count = count - 1 WHERE severity = OLD.severity;
+    END""",
+    "DELETE FROM webhook_counters",
+    """INSERT INTO webhook_counters (severity, count)
+    SELECT severity, COUNT(*) FROM webhook_messages GROUP BY severity""",
+)
+
+
+def create_webhook_schema(cursor):
+    """Create the webhook tables, indexes and triggers; the caller owns the transaction."""
+    cursor.execute(WEBHOOK_MESSAGES_TABLE)
+    for statement in WEBHOOK_INDEXES + WEBHOOK_SOURCES + WEBHOOK_COUNTERS:
+        cursor.execute(statement)
@@ -6,43 +6,176 @@ Supports: text messages, tables, lists, code blocks, and custom data.
 """
 
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider
+import orjson
+import atexit
+import functools
+import queue
 import sqlite3
+import threading
 from datetime import datetime
 import json
 import os
 
+from utils.webhook_schema import create_webhook_schema
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson for request parsing and responses."""
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def dumps(self, obj, **kwargs):
+        # Sorted keys, like Flask's default provider
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS).decode()
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 DB_PATH = "/app/data/prism.db"
 WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "prism-webhook-2026")
 
+# Compact JSON for stored content/payload: no padding spaces, non-ASCII kept as is
+_dumps = functools.partial(json.dumps, separators=(',', ':'), ensure_ascii=False)
+
+# Accepted severity / message type values, each mapped to itself so normalising
+# is one .get(); anything else falls back to info / text
+_SEV_MAP = {severity: severity for severity in ("info", "warning", "error", "critical")}
+_TYPE_MAP = {message_type: message_type for message_type in ("text", "table", "list", "code", "json")}
+
+
+# One connection shared by every request thread (the dev server starts a
+# thread per request, so per-thread connections would reopen each time);
+# hold DB_LOCK while using it
+DB_LOCK = threading.Lock()
+_conn = None
+
 
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    return conn
+    """Get the process-wide connection, opening it on first use (under DB_LOCK)."""
+    global _conn
+    if _conn is None:
+        conn = sqlite3.connect(
+            DB_PATH, check_same_thread=False, isolation_level=None, cached_statements=256
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        atexit.register(conn.close)
+        _conn = conn
+    return _conn
 
 
-def init_webhook_db():
-    """Initialize webhook messages table."""
-    conn = get_db()
-    cursor = conn.cursor()
+# Group commit: request threads queue their message and wait; one writer
+# thread stores everything queued so far in a single transaction, so a burst
+# of webhooks shares one commit instead of paying for one each
+WRITE_BATCH_MAX = 500
+_write_queue = queue.Queue()
+
+INSERT_MESSAGE_SQL = """
+    INSERT INTO webhook_messages (source, severity, message_type, title, content, payload)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+UPSERT_SOURCE_SQL = """
+    INSERT OR REPLACE INTO webhook_sources (source, last_seen)
+    VALUES (?, CURRENT_TIMESTAMP)
+"""
+
+
+class _PendingWrite:
+    """A queued message row; the writer fills in message_id or error, then sets done."""
     
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS webhook_messages (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source TEXT,
-            severity TEXT,
-            message_type TEXT DEFAULT 'text',
-            title TEXT,
-            content TEXT,
-            payload TEXT,
-            received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
+    __slots__ = ('row', 'done', 'message_id', 'error')
     
-    conn.commit()
-    conn.close()
+    def __init__(self, row):
+        self.row = row
+        self.done = threading.Event()
+        self.message_id = None
+        self.error = None
+
+
+def _write_batch(batch):
+    """Insert a batch of messages and their sources in one transaction."""
+    with DB_LOCK:
+        cursor = get_db().cursor()
+        cursor.execute("BEGIN")
+        try:
+            cursor.executemany(INSERT_MESSAGE_SQL, [pending.row for pending in batch])
+            # AUTOINCREMENT ids are consecutive within the transaction, so
+            # the batch occupies the ids ending at the last one inserted
+            last_id = cursor.execute("SELECT last_insert_rowid()").fetchone()[0]
+            for message_id, pending in enumerate(batch, start=last_id - len(batch) + 1):
+                pending.message_id = message_id
+            # NULL never conflicts on the primary key, so a null source would
+            # add a row per batch; skip it like the backfill does
+            sources = dict.fromkeys(pending.row[0] for pending in batch if pending.row[0] is not None)
+            cursor.executemany(UPSERT_SOURCE_SQL, [(source,) for source in sources])
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
+
+def _commit_batch(batch):
+    """Write a batch and wake its waiters; a failed batch is retried row by row."""
+    try:
+        _write_batch(batch)
+    except Exception as e:
+        if len(batch) == 1:
+            batch[0].error = e
+        else:
+            # One bad row rolls back the whole batch; retry each on its own
+            # so only the request that caused it fails
+            for pending in batch:
+                try:
+                    _write_batch([pending])
+                except Exception as row_error:
+                    pending.error = row_error
+    for pending in batch:
+        pending.done.set()
+
+
+def _writer_loop():
+    """Drain the write queue forever, one transaction per batch."""
+    while True:
+        batch = [_write_queue.get()]
+        while len(batch) < WRITE_BATCH_MAX:
+            try:
+                batch.append(_write_queue.get_nowait())
+            except queue.Empty:
+                break
+        _commit_batch(batch)
+
+
+def store_message(row) -> int:
+    """Queue a message row for the writer and wait until it's committed; returns its id."""
+    pending = _PendingWrite(row)
+    _write_queue.put(pending)
+    pending.done.wait()
+    if pending.error is not None:
+        raise pending.error
+    return pending.message_id
+
+
+threading.Thread(target=_writer_loop, name="webhook-writer", daemon=True).start()
+
+
+def init_webhook_db():
+    """Initialize webhook messages table."""
+    with DB_LOCK:
+        cursor = get_db().cursor()
+        cursor.execute("BEGIN")
+        try:
+            create_webhook_schema(cursor)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        
+        # Refresh planner statistics for the schema's indexes
+        cursor.execute("PRAGMA optimize")
 
 
 @app.route('/health', methods=['GET'])
@@ -51,6 +184,26 @@ def health():
     return jsonify({"status": "healthy", "service": "prism-webhook"}), 200
 
 
+class HealthShortCircuit:
+    """WSGI middleware that answers GET /health before Flask routes the request."""
+    
+    # Same bytes the health() view returns; it still serves HEAD etc.
+    BODY = b'{"service":"prism-webhook","status":"healthy"}\n'
+    HEADERS = [('Content-Type', 'application/json'), ('Content-Length', str(len(BODY)))]
+    
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+    
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') == '/health' and environ.get('REQUEST_METHOD') == 'GET':
+            start_response('200 OK', self.HEADERS)
+            return [self.BODY]
+        return self.wsgi_app(environ, start_response)
+
+
+app.wsgi_app = HealthShortCircuit(app.wsgi_app)
+
+
 @app.route('/webhook/receive', methods=['POST'])
 def receive_webhook():
     """
@@ -99,38 +252,29 @@ def receive_webhook():
         
         # Extract fields
         source = payload.get('source', 'Unknown')
-        severity = payload.get('severity', 'info').lower()
-        message_type = payload.get('type', 'text').lower()
+        # str() so a non-string severity/type falls back instead of raising
+        severity = _SEV_MAP.get(str(payload.get('severity', 'info')).lower(), 'info')
+        message_type = _TYPE_MAP.get(str(payload.get('type', 'text')).lower(), 'text')
         title = payload.get('title', '')
         content = payload.get('content', '')
         data = payload.get('data', {})
         
-        # Validate severity
-        if severity not in ['info', 'warning', 'error', 'critical']:
-            severity = 'info'
-        
-        # Validate message type
-        if message_type not in ['text', 'table', 'list', 'code', 'json']:
-            message_type = 'text'
+        # Text columns: other JSON types would fail binding in the writer's batch
+        if source is not None and not isinstance(source, str):
+            source = str(source)
+        if not isinstance(title, str):
+            title = '' if title is None else str(title)
         
         # Convert content to JSON string if it's a dict/list
         if isinstance(content, (dict, list)):
-            content_str = json.dumps(content)
+            content_str = _dumps(content)
         else:
             content_str = str(content)
         
-        # Store in database
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT INTO webhook_messages (source, severity, message_type, title, content, payload)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (source, severity, message_type, title, content_str, json.dumps(data)))
-        
-        conn.commit()
-        message_id = cursor.lastrowid
-        conn.close()
+        # Store in database (returns once the writer has committed it)
+        message_id = store_message(
+            (source, severity, message_type, title, content_str, _dumps(data))
+        )
         
         return jsonify({
             "status": "success",
@@ -146,20 +290,13 @@ def receive_webhook():
 def webhook_stats():
     """Get webhook statistics."""
     try:
-        conn = get_db()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) as total FROM webhook_messages")
-        total = cursor.fetchone()['total']
-        
-        cursor.execute("""
-            SELECT severity, COUNT(*) as count 
-            FROM webhook_messages 
-            GROUP BY severity
-        """)
-        by_severity = {row['severity']: row['count'] for row in cursor.fetchall()}
-        
-        conn.close()
+        with DB_LOCK:
+            cursor = get_db().cursor()
+            
+            cursor.execute("SELECT severity, count FROM webhook_counters WHERE count > 0")
+            # Plain tuples (no row factory): (severity, count) pairs
+            by_severity = dict(cursor.fetchall())
+        total = sum(by_severity.values())
         
         return jsonify({
             "total_messages": total,
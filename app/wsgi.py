@@ -0,0 +1,15 @@
+"""
+Webhook API - WSGI Entry Point
+==============================
+Serves the webhook API under gunicorn instead of Flask's dev server:
+
+    gunicorn -k gthread --threads 16 -w 1 --bind 0.0.0.0:5000 wsgi:app
+
+One worker is enough: inserts funnel through the single group-commit writer
+thread anyway, and request threads only wait on it. Don't use --preload;
+the writer thread is started at import and wouldn't survive the fork.
+"""
+
+from webhook_api import app, init_webhook_db
+
+init_webhook_db()
@@ -1,6 +1,6 @@
 #!/bin/bash
-# Start Flask webhook API in background
-python /app/webhook_api.py &
+# Start the webhook API in background (threaded gunicorn, see wsgi.py)
+gunicorn -k gthread --threads 16 -w 1 --bind 0.0.0.0:5000 --chdir /app wsgi:app &
 
 # Start Streamlit in foreground
 streamlit run /app/main.py
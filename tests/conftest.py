@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+import pytest
+import streamlit as st
+
+APP_DIR = Path(__file__).resolve().parent.parent / "app"
+sys.path.insert(0, str(APP_DIR))
+
+
+@pytest.fixture
+def prism_db(tmp_path, monkeypatch):
+    """Point the app at a fresh SQLite database with the base schema."""
+    from utils import db
+    
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "prism.db"))
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    db.init_db()
+    yield db
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+@pytest.fixture
+def webhook_db(tmp_path, monkeypatch):
+    """Point the webhook API at a fresh SQLite database with its schema."""
+    import webhook_api
+    
+    monkeypatch.setattr(webhook_api, "DB_PATH", str(tmp_path / "prism.db"))
+    monkeypatch.setattr(webhook_api, "_conn", None)
+    webhook_api.init_webhook_db()
+    yield webhook_api
+    with webhook_api.DB_LOCK:
+        webhook_api._conn.close()
@@ -0,0 +1,26 @@
+from datetime import datetime
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from utils.data_processor import process_scc_export
+
+
+def test_parquet_export_with_utc_timestamps():
+    frame = pd.DataFrame({
+        "resource.gcp_metadata.project_display_name": ["alpha", "beta"],
+        "finding.event_time": pd.to_datetime(["2026-01-02 03:04:05", "2026-02-03 04:05:06"], utc=True),
+        "finding.severity": ["HIGH", "LOW"],
+    })
+    upload = BytesIO()
+    frame.to_parquet(upload)
+    
+    output, stats = process_scc_export(upload.getvalue())
+    
+    assert stats['original_rows'] == 2
+    rows = list(load_workbook(output).active.iter_rows(values_only=True))
+    header = rows[0]
+    event_times = [row[header.index("finding.event_time")] for row in rows[1:]]
+    assert event_times == [datetime(2026, 1, 2, 3, 4, 5), datetime(2026, 2, 3, 4, 5, 6)]
+    assert [row[header.index("Project Name")] for row in rows[1:]] == ["alpha", "beta"]
@@ -0,0 +1,34 @@
+def _row(source, title="t"):
+    return (source, "info", "text", title, "hello", "{}")
+
+
+def test_bad_row_fails_alone_in_batch(webhook_db):
+    good, bad = webhook_db._PendingWrite(_row("good")), webhook_db._PendingWrite(_row({"not": "text"}))
+    webhook_db._commit_batch([good, bad])
+    
+    assert good.done.is_set() and bad.done.is_set()
+    assert good.error is None and good.message_id is not None
+    assert bad.error is not None
+    with webhook_db.DB_LOCK:
+        conn = webhook_db.get_db()
+        stored = conn.execute("SELECT id, source FROM webhook_messages").fetchall()
+        sources = conn.execute("SELECT source FROM webhook_sources").fetchall()
+    assert stored == [(good.message_id, "good")]
+    assert sources == [("good",)]
+
+
+def test_receive_coerces_non_text_fields(webhook_db):
+    client = webhook_db.app.test_client()
+    response = client.post("/webhook/receive", json={
+        "secret": webhook_db.WEBHOOK_SECRET,
+        "source": {"name": "workflow"},
+        "title": ["a", "b"],
+        "content": "hello",
+    })
+    
+    assert response.status_code == 200
+    with webhook_db.DB_LOCK:
+        stored = webhook_db.get_db().execute(
+            "SELECT source, title FROM webhook_messages WHERE id = ?", (response.get_json()["id"],)
+        ).fetchone()
+    assert stored == ("{'name': 'workflow'}", "['a', 'b']")
@@ -0,0 +1,79 @@
+import json
+
+from streamlit.testing.v1 import AppTest
+
+from conftest import APP_DIR
+
+DASHBOARD = str(APP_DIR / "pages" / "3_Webhook_Dashboard.py")
+PAGE_SIZE = 20
+
+
+def _add_messages(db, count, message_type):
+    conn = db.get_conn()
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS webhook_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source TEXT,
+            severity TEXT,
+            message_type TEXT DEFAULT 'text',
+            title TEXT,
+            content TEXT,
+            payload TEXT,
+            received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO webhook_messages (source, severity, message_type, title, content, payload, received_at)"
+        " VALUES ('test', 'info', ?, '', ?, '{}', datetime('now', ?))",
+        [(message_type, f"message {i}", f"-{i} seconds") for i in range(count)]
+    )
+
+
+def _run_with_table_selection(at, rows, element_id):
+    """
+    Rerun with the text table's row selection set, as the browser sends it.
+    
+    AppTest can't click dataframe rows, so the selection is added to the
+    widget states by hand; the browser keeps sending it for the same element.
+    """
+    states = at._tree.get_widget_states()
+    state = states.widgets.add()
+    state.id = element_id
+    state.string_value = json.dumps({"selection": {"rows": rows, "columns": []}})
+    return at._run(states)
+
+
+def _delete_buttons(at):
+    return [b for b in at.button if b.key in ("wh_delete_selected", "wh_delete_cards")]
+
+
+def test_paging_forward_drops_table_selection(prism_db):
+    _add_messages(prism_db, PAGE_SIZE + 5, "text")
+    at = AppTest.from_file(DASHBOARD, default_timeout=30).run()
+    
+    table_id = at.dataframe[0].proto.id
+    _run_with_table_selection(at, [0], table_id)
+    assert [b.label for b in _delete_buttons(at)] == ["🗑️ Delete 1 selected"]
+    
+    next(b for b in at.button if b.label == "Older →").click()
+    _run_with_table_selection(at, [0], table_id)
+    
+    assert not at.exception
+    assert not _delete_buttons(at)
+
+
+def test_paging_forward_drops_card_selection(prism_db):
+    _add_messages(prism_db, PAGE_SIZE + 5, "code")
+    at = AppTest.from_file(DASHBOARD, default_timeout=30).run()
+    
+    newest_id = prism_db.get_conn().execute(
+        "SELECT id FROM webhook_messages ORDER BY received_at DESC LIMIT 1"
+    ).fetchone()[0]
+    at.multiselect[0].select(newest_id).run()
+    assert _delete_buttons(at)
+    
+    next(b for b in at.button if b.label == "Older →").click().run()
+    
+    assert not at.exception
+    assert not _delete_buttons(at)
+    assert all(not m.value for m in at.multiselect)